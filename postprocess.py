@@ -6,53 +6,123 @@ postprocess_ovito.py
 """
 
 import argparse
+import io
+import mmap
 import os
 import re
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 
-def parse_thermo_log(logfile):
-    """Parse last thermo table from LAMMPS log file"""
-    with open(logfile, 'r') as f:
-        lines = f.readlines()
-
-    header_idx = None
-    for i, ln in enumerate(lines):
-        if re.search(r'^\s*Step\b', ln) and re.search(r'v_strain', ln, re.IGNORECASE):
-            header_idx = i
-
-    if header_idx is None:
+_HEADER = re.compile(r'^\s*Step\b.*(?i:v_strain)')
+
+def _iter_lines_reverse(mm):
+    """Yield (offset, line) pairs of a memory-mapped file, last line first"""
+    end = len(mm)
+    while end > 0:
+        start = mm.rfind(b'\n', 0, end - 1) + 1
+        yield start, mm[start:end].decode(errors='replace')
+        end = start
+
+def _row_pattern(ncols):
+    """Compiled bytes pattern for a numeric thermo row with at least ncols fields"""
+    return re.compile(rb'[ \t]*[-+]?\d\S*(?:[ \t]+\S+){%d}' % (ncols - 1))
+
+def _table_end(buf, start, ncols):
+    """Offset of the first line from start that is not a complete thermo row"""
+    row = _row_pattern(ncols).pattern
+    m = re.compile(rb'^(?!' + row + rb')', re.MULTILINE).search(buf, start)
+    return len(buf) if m is None else m.start()
+
+def _read_last_table_stream(f):
+    """Return column names and data rows of the last thermo table in a binary stream"""
+    colnames, rows, row = None, [], None
+    for raw in f:
+        ln = raw.decode(errors='replace')
+        if _HEADER.search(ln):
+            colnames = ln.split()
+            rows, row = [], _row_pattern(len(colnames))
+        elif row is not None:
+            if row.match(raw):
+                rows.append(raw)
+            else:
+                row = None
+
+    if colnames is None:
         raise RuntimeError("Could not find thermo table header in log file.")
+    return colnames, b"".join(rows)
+
+def _detect_columns(colnames):
+    """Pick the strain and shear stress (Sxy, else Pxy) thermo columns"""
+    lowered = [(c.lower(), c) for c in colnames]
+    strain_col = next((orig for lc, orig in lowered if "strain" in lc), None)
+    stress_col = next((orig for lc, orig in lowered if "sxy" in lc), None)
+    if stress_col is None:
+        stress_col = next((orig for lc, orig in lowered if "pxy" in lc), None)
+    if strain_col is None:
+        raise RuntimeError("Could not find strain column")
+    if stress_col is None:
+        raise RuntimeError("Could not find shear stress column (Sxy or Pxy)")
+    return strain_col, stress_col
 
-    colnames = re.split(r'\s+', lines[header_idx].strip())
-
-    data_rows = []
-    for ln in lines[header_idx+1:]:
-        if ln.strip() == '':
-            break
-        if re.match(r'^\s*[-+]?\d', ln):
-            parts = re.split(r'\s+', ln.strip())
-            if len(parts) >= len(colnames):
-                data_rows.append(parts[:len(colnames)])
-        else:
-            break
-
-    df = pd.DataFrame(data_rows, columns=colnames).apply(pd.to_numeric)
+def parse_thermo_log(logfile):
+    """Parse strain and shear stress from last thermo table in LAMMPS log file"""
+    if not (os.path.isfile(logfile) and os.path.getsize(logfile) > 0):
+        # mmap needs a non-empty regular file; pipes and /dev/stdin scan forward
+        with open(logfile, 'rb') as f:
+            colnames, data = _read_last_table_stream(f)
+    else:
+        with open(logfile, 'rb') as f, \
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            header_off = None
+            for off, ln in _iter_lines_reverse(mm):
+                if _HEADER.search(ln):
+                    header_off = off
+                    break
+
+            if header_off is None:
+                raise RuntimeError("Could not find thermo table header in log file.")
+
+            mm.seek(header_off)
+            colnames = mm.readline().decode(errors='replace').split()
+            data_start = mm.tell()
+            data = mm[data_start:_table_end(mm, data_start, len(colnames))]
+
+    strain_col, stress_col = _detect_columns(colnames)
+    usecols = [colnames.index(strain_col), colnames.index(stress_col)]
+    if data:
+        arr = np.loadtxt(io.BytesIO(data), dtype=np.float64, ndmin=2,
+                         usecols=usecols)
+    else:
+        arr = np.empty((0, len(usecols)))
+
+    df = pd.DataFrame(arr, columns=[strain_col, stress_col])
     return df
 
+def _decimate(x, y, max_points=2000):
+    """Average (x, y) within equal-width x bins, keeping at most max_points"""
+    if len(x) <= max_points:
+        return x, y
+    bins = np.linspace(x.min(), x.max(), max_points + 1)
+    idx = np.digitize(x, bins[1:-1])
+    counts = np.bincount(idx, minlength=max_points)
+    mask = counts > 0
+    xs = np.bincount(idx, x, minlength=max_points)[mask] / counts[mask]
+    ys = np.bincount(idx, y, minlength=max_points)[mask] / counts[mask]
+    return xs, ys
+
 def plot_stress_strain(strain, stress, outdir):
-    os.makedirs(outdir, exist_ok=True)
-    plt.figure(figsize=(6,4))
-    plt.plot(strain, stress, '-o', markersize=3)
-    plt.xlabel('Shear strain')
-    plt.ylabel('Shear stress (Pxy)')
-    plt.title('Stress-Strain Curve')
-    plt.grid(True)
-    plt.xticks(rotation=45)
-    plt.tight_layout()
-    plt.savefig(os.path.join(outdir, 'stress_strain.png'), dpi=300)
-    plt.close()
+    strain, stress = _decimate(strain, stress)
+    fig, ax = plt.subplots(figsize=(6,4))
+    ax.plot(strain, stress, '-o', markersize=3)
+    ax.set_xlabel('Shear strain')
+    ax.set_ylabel('Shear stress (Pxy)')
+    ax.set_title('Stress-Strain Curve')
+    ax.grid(True)
+    ax.tick_params(axis='x', labelrotation=45)
+    fig.tight_layout()
+    fig.savefig(os.path.join(outdir, 'stress_strain.png'), dpi=300, bbox_inches='tight')
+    plt.close(fig)
 
 def main():
     parser = argparse.ArgumentParser()
@@ -62,20 +132,7 @@ def main():
 
     print("Parsing LAMMPS log:", args.log)
     thermo = parse_thermo_log(args.log)
-    print("Thermo columns found:", thermo.columns.tolist())
-
-    # Detect columns
-    strain_col_candidates = [c for c in thermo.columns if "strain" in c.lower()]
-    if not strain_col_candidates:
-        raise RuntimeError("Could not find strain column")
-    strain_col = strain_col_candidates[0]
-
-    stress_col_candidates = [c for c in thermo.columns if "sxy" in c.lower()]
-    if not stress_col_candidates:
-        stress_col_candidates = [c for c in thermo.columns if "pxy" in c.lower()]
-    if not stress_col_candidates:
-        raise RuntimeError("Could not find shear stress column (Sxy or Pxy)")
-    stress_col = stress_col_candidates[0]
+    strain_col, stress_col = thermo.columns
 
     print(f"Using strain column: {strain_col}, shear stress column: {stress_col}")
 
@@ -84,8 +141,9 @@ def main():
 
     # Save stress-strain CSV
     os.makedirs(args.out, exist_ok=True)
-    df_out = pd.DataFrame({'strain': strain, 'shear_stress': stress})
-    df_out.to_csv(os.path.join(args.out, 'stress_strain.csv'), index=False)
+    np.savetxt(os.path.join(args.out, 'stress_strain.csv'),
+               np.column_stack([strain, stress]), delimiter=',',
+               header='strain,shear_stress', comments='', fmt='%.8g')
     print("Saved CSV:", os.path.join(args.out, 'stress_strain.csv'))
 
     # Plot stress-strain